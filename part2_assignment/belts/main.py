@@ -1,14 +1,28 @@
 #!/usr/bin/env python
 # part2_assignment/belts/main.py
+import os
 import sys
 import json
+import argparse
 import networkx as nx
+from networkx.algorithms import flow as nx_flow
 from collections import defaultdict
 
 SUPER_SOURCE = "_SUPER_SOURCE"
 SUPER_SINK = "_SUPER_SINK"
+SOURCE_ROOT = "_SOURCE_ROOT"
+SINK_ROOT = "_SINK_ROOT"
 TOLERANCE = 1e-9
 
+FLOW_BACKENDS = {
+    "preflow_push": nx_flow.preflow_push,
+    "edmonds_karp": nx_flow.edmonds_karp,
+    "shortest_augmenting_path": nx_flow.shortest_augmenting_path,
+    "dinitz": nx_flow.dinitz,
+    "boykov_kolmogorov": nx_flow.boykov_kolmogorov,
+}
+SMALL_GRAPH_EDGES = 64
+
 def get_node_names(v, split_nodes):
     if v in split_nodes:
         return f"{v}_IN", f"{v}_OUT"
@@ -28,17 +42,37 @@ def get_original_name(v):
         return v[:-4]
     return v
 
-def solve_belts(data):
-    
+def select_backend(G):
+    """Picks a max-flow algorithm from the size of the transformed graph.
+
+    Lower bounds and node caps show up here as the extra super-node and split
+    edges they add. Small graphs use Edmonds-Karp, whose per-call setup is the
+    lightest; larger ones use preflow-push, which scales best in networkx.
+    """
+    if G.number_of_edges() <= SMALL_GRAPH_EDGES:
+        return "edmonds_karp"
+    return "preflow_push"
+
+def resolve_flow_func(G, backend=None):
+    name = backend or os.environ.get("BELTS_BACKEND") or "auto"
+    if name == "auto":
+        name = select_backend(G)
+    if name not in FLOW_BACKENDS:
+        raise ValueError(f"Unknown belts backend '{name}', expected one of {', '.join(FLOW_BACKENDS)}")
+    return FLOW_BACKENDS[name]
+
+def build_bounded_graph(data):
+    """Builds the node-split, lower-bound-shifted graph shared by both belts modes.
+
+    Returns (G, split_nodes, lower_bounds, lower_demand, error); error is an
+    infeasible result when an edge has lower_bound > upper_bound.
+    """
     G = nx.DiGraph()
-    
+
     sources = data.get("sources", {})
     sink_node = data["sink"]
     node_caps = data.get("node_caps", {})
     edges = data.get("edges", [])
-    
-    total_supply = sum(sources.values())
-    total_demand = total_supply 
 
     all_nodes = set(sources.keys()) | {sink_node}
     for edge in edges:
@@ -67,7 +101,7 @@ def solve_belts(data):
         
         cap_prime = hi - lo
         if cap_prime < -TOLERANCE:
-            return {
+            return G, split_nodes, lower_bounds, 0.0, {
                 "status": "infeasible",
                 "cut_reachable": [],
                 "deficit": {"demand_balance": lo - hi, "tight_edges": [{"from": u_orig, "to": v_orig, "flow_needed": lo}]}
@@ -75,21 +109,63 @@ def solve_belts(data):
         
         G.add_edge(u_mapped_out, v_mapped_in, capacity=max(0, cap_prime))
         
-        imbalance[v_orig] += lo
-        imbalance[u_orig] -= lo
+        # Keyed by mapped node, so lower-bound flow into or out of a capped node
+        # still crosses its v_IN -> v_OUT edge.
+        imbalance[v_mapped_in] += lo
+        imbalance[u_mapped_out] -= lo
         
         lower_bounds[(u_orig, v_orig)] = lo
 
-    total_demand_to_meet = 0.0
+    lower_demand = 0.0
     
-    for v_orig, imb in imbalance.items():
+    for v_mapped, imb in imbalance.items():
         if imb > TOLERANCE:
-            v_mapped_in = map_in(v_orig, split_nodes)
-            G.add_edge(SUPER_SOURCE, v_mapped_in, capacity=imb)
-            total_demand_to_meet += imb
+            G.add_edge(SUPER_SOURCE, v_mapped, capacity=imb)
+            lower_demand += imb
         elif imb < -TOLERANCE:
-            v_mapped_out = map_out(v_orig, split_nodes)
-            G.add_edge(v_mapped_out, SUPER_SINK, capacity=-imb)
+            G.add_edge(v_mapped, SUPER_SINK, capacity=-imb)
+
+    return G, split_nodes, lower_bounds, lower_demand, None
+
+def cut_certificate(G, deficit, flow_func):
+    try:
+        cut_value, partition = nx.minimum_cut(G, SUPER_SOURCE, SUPER_SINK, flow_func=flow_func)
+        reachable, non_reachable = partition
+    except nx.NetworkXError:
+        try:
+            reachable = nx.descendants(G, SUPER_SOURCE) | {SUPER_SOURCE}
+        except nx.NetworkXError:
+            reachable = set()
+
+    cut_nodes = set()
+    for v in reachable:
+        if v != SUPER_SOURCE:
+            cut_nodes.add(get_original_name(v))
+    
+    return {
+        "status": "infeasible",
+        "cut_reachable": sorted(list(cut_nodes)),
+        "deficit": {
+            "demand_balance": deficit,
+            "tight_nodes": [], 
+            "tight_edges": []
+        }
+    }
+
+def solve_belts(data, backend=None, mode="feasibility"):
+
+    if mode == "max_throughput":
+        return solve_belts_max_throughput(data, backend)
+
+    sources = data.get("sources", {})
+    sink_node = data["sink"]
+    
+    total_supply = sum(sources.values())
+    total_demand = total_supply 
+
+    G, split_nodes, lower_bounds, total_demand_to_meet, error = build_bounded_graph(data)
+    if error is not None:
+        return error
             
     for s_orig, supply in sources.items():
         s_mapped_out = map_out(s_orig, split_nodes)
@@ -98,44 +174,21 @@ def solve_belts(data):
         
     t_mapped_in = map_in(sink_node, split_nodes)
     G.add_edge(t_mapped_in, SUPER_SINK, capacity=total_demand)
+    flow_func = resolve_flow_func(G, backend)
 
     if total_demand_to_meet < TOLERANCE:
         flow_value = 0.0
         flow_dict = {}
     else:
         try:
-            flow_value, flow_dict = nx.maximum_flow(G, SUPER_SOURCE, SUPER_SINK)
+            flow_value, flow_dict = nx.maximum_flow(G, SUPER_SOURCE, SUPER_SINK, flow_func=flow_func)
         except nx.NetworkXUnbounded:
             return { "status": "infeasible", "cut_reachable": [], "deficit": {"demand_balance": float('inf'), "tight_nodes": ["Unbounded flow"]}}
         except nx.NetworkXError:
              return { "status": "infeasible", "cut_reachable": [], "deficit": {"demand_balance": total_demand_to_meet, "tight_nodes": ["Disconnected graph"]}}
 
     if abs(flow_value - total_demand_to_meet) > TOLERANCE:
-        deficit = total_demand_to_meet - flow_value
-        
-        try:
-            cut_value, partition = nx.minimum_cut(G, SUPER_SOURCE, SUPER_SINK)
-            reachable, non_reachable = partition
-        except nx.NetworkXError:
-            try:
-                reachable = nx.descendants(G, SUPER_SOURCE) | {SUPER_SOURCE}
-            except nx.NetworkXError:
-                reachable = set()
-
-        cut_nodes = set()
-        for v in reachable:
-            if v != SUPER_SOURCE:
-                cut_nodes.add(get_original_name(v))
-        
-        return {
-            "status": "infeasible",
-            "cut_reachable": sorted(list(cut_nodes)),
-            "deficit": {
-                "demand_balance": deficit,
-                "tight_nodes": [], 
-                "tight_edges": []
-            }
-        }
+        return cut_certificate(G, total_demand_to_meet - flow_value, flow_func)
 
     final_flows = []
     
@@ -163,7 +216,196 @@ def solve_belts(data):
     }
 
 
+def add_residual(R, u, v, amount):
+    if amount <= TOLERANCE:
+        return
+    if R.has_edge(u, v):
+        R[u][v]["capacity"] += amount
+    else:
+        R.add_edge(u, v, capacity=amount)
+
+def build_residual(G, flow, skip_edges=()):
+    """Residual graph of `flow` on G, leaving out the lower-bound super nodes.
+
+    Dropping SUPER_SOURCE/SUPER_SINK keeps every lower bound satisfied by any
+    flow later augmented on the residual.
+    """
+    R = nx.DiGraph()
+    for u, v, attrs in G.edges(data=True):
+        if u in (SUPER_SOURCE, SUPER_SINK) or v in (SUPER_SOURCE, SUPER_SINK):
+            continue
+        if (u, v) in skip_edges:
+            continue
+        f = flow.get((u, v), 0.0)
+        add_residual(R, u, v, attrs["capacity"] - f)
+        add_residual(R, v, u, f)
+    return R
+
+def apply_augmentation(G, flow, aug_dict):
+    """Pushes a flow found on the residual graph back onto the edges of G."""
+    for u, targets in aug_dict.items():
+        for v, a_uv in targets.items():
+            net = a_uv - aug_dict.get(v, {}).get(u, 0.0)
+            if net <= TOLERANCE:
+                continue
+            if G.has_edge(v, u):
+                cancel = min(net, flow.get((v, u), 0.0))
+                flow[(v, u)] = flow.get((v, u), 0.0) - cancel
+                net -= cancel
+            if net > TOLERANCE:
+                flow[(u, v)] = flow.get((u, v), 0.0) + net
+
+def detach_edges(R, u, v):
+    """Removes the residual arcs between u and v in both directions and returns them.
+
+    Pass the result to R.add_edges_from to put them back.
+    """
+    removed = []
+    for a, b in ((u, v), (v, u)):
+        if R.has_edge(a, b):
+            removed.append((a, b, dict(R[a][b])))
+            R.remove_edge(a, b)
+    return removed
+
+def reachable_sets(R, source, sink):
+    from_source = {source}
+    to_sink = {sink}
+    if source in R:
+        from_source |= nx.descendants(R, source)
+    if sink in R:
+        to_sink |= nx.ancestors(R, sink)
+    return from_source, to_sink
+
+def solve_belts_max_throughput(data, backend=None):
+    """Maximum routable throughput, per-source maxima and cap sensitivities.
+
+    The sources and sink are joined by a SINK_ROOT -> SOURCE_ROOT return edge, so
+    the lower-bound feasibility max-flow already routes some throughput. The
+    rest is augmented SOURCE_ROOT -> SINK_ROOT on the residual of that flow, and
+    the per-cap sensitivities come from two reachability searches on the final
+    residual. Each per-source maximum is one more max-flow on that residual.
+    """
+    sources = data.get("sources", {})
+    sink_node = data["sink"]
+    node_caps = data.get("node_caps", {})
+
+    total_supply = sum(sources.values())
+
+    G, split_nodes, lower_bounds, lower_demand, error = build_bounded_graph(data)
+    if error is not None:
+        return error
+
+    for s_orig, supply in sources.items():
+        G.add_edge(SOURCE_ROOT, map_out(s_orig, split_nodes), capacity=supply)
+
+    t_mapped_in = map_in(sink_node, split_nodes)
+    G.add_edge(t_mapped_in, SINK_ROOT, capacity=total_supply)
+    G.add_edge(SINK_ROOT, SOURCE_ROOT, capacity=total_supply)
+    return_edge = (SINK_ROOT, SOURCE_ROOT)
+    flow_func = resolve_flow_func(G, backend)
+
+    flow = {}
+    if lower_demand > TOLERANCE:
+        try:
+            flow_value, flow_dict = nx.maximum_flow(G, SUPER_SOURCE, SUPER_SINK, flow_func=flow_func)
+        except nx.NetworkXUnbounded:
+            return { "status": "infeasible", "cut_reachable": [], "deficit": {"demand_balance": float('inf'), "tight_nodes": ["Unbounded flow"]}}
+
+        if abs(flow_value - lower_demand) > TOLERANCE:
+            return cut_certificate(G, lower_demand - flow_value, flow_func)
+
+        for u, v in G.edges():
+            flow[(u, v)] = flow_dict[u][v]
+
+    base_throughput = flow.get(return_edge, 0.0)
+
+    R = build_residual(G, flow, skip_edges={return_edge})
+    aug_value = 0.0
+    if SOURCE_ROOT in R and SINK_ROOT in R:
+        aug_value, aug_dict = nx.maximum_flow(R, SOURCE_ROOT, SINK_ROOT, flow_func=flow_func)
+        apply_augmentation(G, flow, aug_dict)
+
+    throughput = base_throughput + aug_value
+    flow[return_edge] = throughput
+
+    # The queries below share this residual graph, detaching the arcs each one
+    # must not use. networkx still builds its own residual inside every
+    # max-flow call, so the per-source maxima cost one max-flow per source.
+    R = build_residual(G, flow)
+
+    removed = detach_edges(R, *return_edge)
+    from_source, to_sink = reachable_sets(R, SOURCE_ROOT, SINK_ROOT)
+    R.add_edges_from(removed)
+
+    def marginal_gain(u_mapped, v_mapped):
+        return 1.0 if u_mapped in from_source and v_mapped in to_sink else 0.0
+
+    per_source_max = {}
+    for s_orig, supply in sorted(sources.items()):
+        s_mapped = map_out(s_orig, split_nodes)
+        current = flow.get((SOURCE_ROOT, s_mapped), 0.0)
+
+        extra = 0.0
+        if supply - current > TOLERANCE and s_mapped in R and SOURCE_ROOT in R:
+            removed = detach_edges(R, SOURCE_ROOT, s_mapped)
+            extra = nx.maximum_flow_value(R, s_mapped, SOURCE_ROOT, flow_func=flow_func)
+            R.add_edges_from(removed)
+        per_source_max[s_orig] = current + min(extra, supply - current)
+
+    final_flows = []
+    tight_edges = []
+    for edge in data.get("edges", []):
+        u_orig, v_orig = edge["from"], edge["to"]
+        if (u_orig, v_orig) not in lower_bounds:
+            continue
+        lo = lower_bounds[(u_orig, v_orig)]
+        hi = edge.get("upper_bound", float('inf'))
+        u_mapped = map_out(u_orig, split_nodes)
+        v_mapped = map_in(v_orig, split_nodes)
+
+        final_flow = flow.get((u_mapped, v_mapped), 0.0) + lo
+        if final_flow > TOLERANCE:
+            final_flows.append({"from": u_orig, "to": v_orig, "flow": final_flow})
+        if final_flow >= hi - TOLERANCE:
+            tight_edges.append({
+                "from": u_orig,
+                "to": v_orig,
+                "flow": final_flow,
+                "marginal_gain": marginal_gain(u_mapped, v_mapped)
+            })
+
+    tight_nodes = []
+    for v in sorted(split_nodes):
+        v_in, v_out = get_node_names(v, split_nodes)
+        node_flow = flow.get((v_in, v_out), 0.0)
+        if node_flow >= node_caps[v] - TOLERANCE:
+            tight_nodes.append({
+                "node": v,
+                "flow": node_flow,
+                "marginal_gain": marginal_gain(v_in, v_out)
+            })
+
+    return {
+        "status": "ok",
+        "mode": "max_throughput",
+        "max_flow_per_min": throughput,
+        "requested_per_min": total_supply,
+        "unrouted_per_min": total_supply - throughput,
+        "per_source_max_per_min": per_source_max,
+        "flows": final_flows,
+        "tight_edges": tight_edges,
+        "tight_nodes": tight_nodes
+    }
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Bounded belts flow solver (JSON on stdin/stdout).")
+    parser.add_argument("--max-throughput", action="store_true",
+                        help="report the maximum routable throughput instead of checking sum(sources)")
+    parser.add_argument("--backend", choices=("auto",) + tuple(FLOW_BACKENDS), default=None,
+                        help="max-flow algorithm; defaults to $BELTS_BACKEND or auto")
+    args = parser.parse_args()
+
     try:
         try:
             indata = json.load(sys.stdin)
@@ -171,7 +413,8 @@ def main():
             sys.stderr.write(f"Error: Invalid JSON input. {e}\n")
             return
 
-        result = solve_belts(indata)
+        mode = "max_throughput" if args.max_throughput else "feasibility"
+        result = solve_belts(indata, args.backend, mode)
 
         try:
             json.dump(result, sys.stdout, indent=None)
@@ -1,11 +1,209 @@
 #!/usr/bin/env python
 # part2_assignment/factory/main.py
+import os
 import sys
 import json
+import argparse
 import pulp
 from collections import defaultdict
 
-def solve_factory(data):
+LP_BACKENDS = {
+    "highs": lambda: pulp.HiGHS(msg=False),
+    "cbc": lambda: pulp.PULP_CBC_CMD(msg=False),
+}
+BACKENDS = ("tree",) + tuple(LP_BACKENDS)
+
+def recipe_rates(recipe, machines, modules):
+    """Returns (effective crafts per minute, productivity multiplier) of one machine."""
+    m_name = recipe["machine"]
+    machine_info = machines.get(m_name, {})
+    module_info = modules.get(m_name, {})
+
+    base_speed = machine_info.get("crafts_per_min", 1) 
+    speed_mod = module_info.get("speed", 0.0)
+    prod_mod = module_info.get("prod", 0.0)
+    time_s = recipe["time_s"]
+
+    return (base_speed * (1.0 + speed_mod) * 60.0) / time_s, 1.0 + prod_mod
+
+def tree_plan(data):
+    """Crafts per unit of target for factories without cycles, byproducts or choices.
+
+    Every recipe must have a single output, every non-raw item a single producer,
+    and the recipes feeding the target must not form a cycle. Returns
+    (unit_crafts, unit_demand, eff_crafts), or None if the model is not of that shape.
+    """
+    machines = data.get("machines", {})
+    recipes = data.get("recipes", {})
+    modules = data.get("modules", {})
+    raw_items = set(data.get("limits", {}).get("raw_supply_per_min", {}).keys())
+    target_item = data["target"]["item"]
+
+    producer = {}
+    eff_crafts = {}
+    prod_multipliers = {}
+    for r_name, recipe in recipes.items():
+        outs = recipe.get("out", {})
+        if len(outs) != 1:
+            return None
+        (item, amount), = outs.items()
+        if amount <= 0 or item in raw_items or item in producer:
+            return None
+        eff_crafts[r_name], prod_multipliers[r_name] = recipe_rates(recipe, machines, modules)
+        if eff_crafts[r_name] <= 1e-9:
+            return None
+        producer[item] = r_name
+
+    if target_item not in producer:
+        return None
+
+    # Iterative depth-first post-order, so long recipe chains cannot hit the
+    # recursion limit. `order` lists each producer after all of its inputs'.
+    order = []
+    state = {target_item: "visiting"}
+    stack = [(target_item, iter(recipes[producer[target_item]].get("in", {})))]
+    while stack:
+        item, inputs = stack[-1]
+        for in_item in inputs:
+            if in_item not in producer or state.get(in_item) == "done":
+                continue
+            if state.get(in_item) == "visiting":
+                return None
+            state[in_item] = "visiting"
+            stack.append((in_item, iter(recipes[producer[in_item]].get("in", {}))))
+            break
+        else:
+            stack.pop()
+            state[item] = "done"
+            order.append(producer[item])
+
+    unit_crafts = {}
+    unit_demand = defaultdict(float)
+    unit_demand[target_item] = 1.0
+    for r_name in reversed(order):
+        recipe = recipes[r_name]
+        (item, amount), = recipe["out"].items()
+        xr = unit_demand[item] / (amount * prod_multipliers[r_name])
+        unit_crafts[r_name] = xr
+        for in_item, in_amount in recipe.get("in", {}).items():
+            unit_demand[in_item] += xr * in_amount
+
+    return unit_crafts, unit_demand, eff_crafts
+
+def backend_available(name):
+    if name == "tree":
+        return True
+    try:
+        return LP_BACKENDS[name]().available()
+    except AttributeError:
+        return False
+
+def select_backend(data):
+    """Picks the cheapest backend for the model.
+
+    Tree-shaped models of any size are solved in closed form. Everything
+    else goes to the first available LP engine, preferring in-process HiGHS to
+    CBC, which is started as a separate process on every solve. Returns
+    (name, plan); plan is the tree plan when the tree backend is picked, so
+    it is not computed twice.
+    """
+    plan = tree_plan(data)
+    if plan is not None:
+        return "tree", plan
+    for name in LP_BACKENDS:
+        if backend_available(name):
+            return name, None
+    return "cbc", None
+
+def resolve_backend(data, backend=None):
+    name = backend or os.environ.get("FACTORY_BACKEND") or "auto"
+    if name == "auto":
+        return select_backend(data)
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown factory backend '{name}', expected one of {', '.join(BACKENDS)}")
+    if not backend_available(name):
+        raise ValueError(f"Factory backend '{name}' is not available")
+    return name, None
+
+def solve_factory_tree(data, plan=None):
+    """Solves a tree-shaped factory without an LP.
+
+    Crafts, machine counts and raw draws all scale linearly with the target
+    rate, so the max feasible rate is the smallest cap / usage-per-unit ratio.
+    """
+    if plan is None:
+        plan = tree_plan(data)
+    if plan is None:
+        raise ValueError("Factory is not tree-shaped; the tree backend cannot solve it")
+    unit_crafts, unit_demand, eff_crafts = plan
+
+    recipes = data.get("recipes", {})
+    limits = data.get("limits", {})
+    requested_target_rate = float(data["target"]["rate_per_min"])
+    max_machines = limits.get("max_machines", {})
+    raw_supply_caps = limits.get("raw_supply_per_min", {})
+
+    unit_machines = defaultdict(float)
+    for r_name, recipe in recipes.items():
+        unit_machines[recipe["machine"]] += unit_crafts.get(r_name, 0.0) / eff_crafts[r_name]
+
+    caps = []
+    for item, cap in raw_supply_caps.items():
+        caps.append((f"{item} supply", cap, unit_demand.get(item, 0.0)))
+    for m_name, cap in max_machines.items():
+        if m_name in unit_machines:
+            caps.append((f"{m_name} cap", cap, unit_machines[m_name]))
+
+    if any(cap < -1e-9 for _, cap, _ in caps):
+        return {
+            "status": "infeasible",
+            "max_feasible_target_per_min": 0.0,
+            "bottleneck_hint": ["Fundamental infeasibility"]
+        }
+
+    # Usage below 1e-12 per unit of target is round-off, not a real draw; it is
+    # left out of both the feasibility check and the max-rate ratio.
+    caps = [(hint, cap, usage) for hint, cap, usage in caps if usage > 1e-12]
+
+    if all(requested_target_rate * usage <= cap + 1e-9 for _, cap, usage in caps):
+        rate = requested_target_rate
+        return {
+            "status": "ok",
+            "per_recipe_crafts_per_min": {
+                r_name: rate * unit_crafts.get(r_name, 0.0) for r_name in recipes
+            },
+            "per_machine_counts": {
+                m_name: rate * usage
+                for m_name, usage in unit_machines.items()
+                if rate * usage > 1e-9
+            },
+            "raw_consumption_per_min": {
+                item: rate * unit_demand[item]
+                for item in raw_supply_caps
+                if rate * unit_demand.get(item, 0.0) > 1e-9
+            }
+        }
+
+    max_rate = min(cap / usage for _, cap, usage in caps)
+
+    tolerance = 1e-6
+    bottleneck_hints = [
+        hint for hint, cap, usage in caps
+        if abs(cap - max_rate * usage) < tolerance
+    ]
+
+    return {
+        "status": "infeasible",
+        "max_feasible_target_per_min": max_rate,
+        "bottleneck_hint": sorted(list(set(bottleneck_hints)))
+    }
+
+def solve_factory(data, backend=None):
+
+    backend, plan = resolve_backend(data, backend)
+    if backend == "tree":
+        return solve_factory_tree(data, plan)
+    lp_solver = LP_BACKENDS[backend]
 
     machines = data.get("machines", {})
     recipes = data.get("recipes", {})
@@ -25,20 +223,8 @@ def solve_factory(data):
     intermediate_items = set()
 
     for r_name, recipe in recipes.items():
-        m_name = recipe["machine"]
-        recipe_machine[r_name] = m_name
-        
-        machine_info = machines.get(m_name, {})
-        module_info = modules.get(m_name, {})
-
-        base_speed = machine_info.get("crafts_per_min", 1) 
-        speed_mod = module_info.get("speed", 0.0)
-        prod_mod = module_info.get("prod", 0.0)
-        time_s = recipe["time_s"]
-        
-        prod_multipliers[r_name] = 1.0 + prod_mod
-
-        eff_crafts[r_name] = (base_speed * (1.0 + speed_mod) * 60.0) / time_s
+        recipe_machine[r_name] = recipe["machine"]
+        eff_crafts[r_name], prod_multipliers[r_name] = recipe_rates(recipe, machines, modules)
 
         for item in recipe.get("in", {}):
             all_items.add(item)
@@ -119,7 +305,7 @@ def solve_factory(data):
         if usage is not None:
             prob += usage <= cap + 1e-9, f"Machine_Cap_{m_name}" 
 
-    prob.solve(pulp.PULP_CBC_CMD(msg=False))
+    prob.solve(lp_solver())
 
     if prob.status == pulp.LpStatusOptimal:
         per_recipe_crafts = {
@@ -197,7 +383,7 @@ def solve_factory(data):
             prob_max += c, f"Machine_Cap_{m_name}"
             constraint_map[f"machine:{m_name}"] = c 
 
-    prob_max.solve(pulp.PULP_CBC_CMD(msg=False))
+    prob_max.solve(lp_solver())
 
     if prob_max.status != pulp.LpStatusOptimal:
         return {
@@ -226,6 +412,11 @@ def solve_factory(data):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Factory steady-state solver (JSON on stdin/stdout).")
+    parser.add_argument("--backend", choices=("auto",) + BACKENDS, default=None,
+                        help="solver backend; defaults to $FACTORY_BACKEND or auto")
+    args = parser.parse_args()
+
     try:
         try:
             indata = json.load(sys.stdin)
@@ -233,7 +424,7 @@ def main():
             sys.stderr.write(f"Error: Invalid JSON input. {e}\n")
             return
 
-        result = solve_factory(indata)
+        result = solve_factory(indata, args.backend)
 
         try:
             json.dump(result, sys.stdout, indent=None) 
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# part2_assignment/pipeline/main.py
+import os
+import sys
+import json
+import copy
+import argparse
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from factory.main import solve_factory, BACKENDS
+from belts.main import solve_belts, FLOW_BACKENDS
+
+MAX_ROUNDS = 10
+TOLERANCE = 1e-9
+RATE_BACKOFF = 1e-6
+ITEM_NODE_PREFIX = "item:"
+
+def build_belts_input(template, raw_consumption):
+    """Fills a belts topology template with rates taken from a factory solution.
+
+    A source whose value is a string names the raw item it carries. Each such
+    item becomes one virtual source `item:<name>` supplying the item's whole
+    consumption, with an uncapped edge into every template node that named it,
+    so the max-flow picks the split. Numeric sources are passed through unchanged.
+    """
+    filled_sources = {}
+    item_edges = []
+    item_nodes = {}
+    for s_name, value in template.get("sources", {}).items():
+        if isinstance(value, str):
+            item_node = ITEM_NODE_PREFIX + value
+            filled_sources[item_node] = raw_consumption.get(value, 0.0)
+            item_edges.append({"from": item_node, "to": s_name})
+            item_nodes[item_node] = value
+        else:
+            filled_sources[s_name] = value
+
+    belts_data = copy.deepcopy(template)
+    belts_data["sources"] = filled_sources
+    belts_data["edges"] = list(belts_data.get("edges", [])) + item_edges
+    return belts_data, item_nodes
+
+def belt_caps(belts_data, item_nodes, belts_backend=None):
+    """Raw-supply caps for the items the belts cannot carry in full.
+
+    Each cap is the flow max-throughput mode routes out of the item's virtual
+    source. Returns an empty dict when the lower bounds cannot be met or every
+    item is fully routed, i.e. the shortfall is on numeric sources and raw caps
+    cannot help.
+    """
+    max_result = solve_belts(belts_data, belts_backend, mode="max_throughput")
+    if max_result["status"] != "ok":
+        return {}
+
+    routed = defaultdict(float)
+    for flow in max_result["flows"]:
+        if flow["from"] in item_nodes:
+            routed[flow["from"]] += flow["flow"]
+
+    return {
+        item: routed[item_node]
+        for item_node, item in item_nodes.items()
+        if routed[item_node] < belts_data["sources"][item_node] - TOLERANCE
+    }
+
+def solve_pipeline(data, factory_backend=None, belts_backend=None):
+
+    factory_data = copy.deepcopy(data["factory"])
+    template = data["belts"]
+    max_rounds = data.get("max_rounds", MAX_ROUNDS)
+    requested_target_rate = factory_data["target"]["rate_per_min"]
+
+    limits = factory_data.setdefault("limits", {})
+    raw_supply_caps = limits.setdefault("raw_supply_per_min", {})
+
+    factory_result = None
+    belts_result = None
+    round_num = 0
+
+    def result(status, error=None):
+        out = {
+            "status": status,
+            "rounds": round_num,
+            "requested_target_per_min": requested_target_rate,
+            "target_per_min": factory_data["target"]["rate_per_min"],
+            "raw_supply_caps": raw_supply_caps,
+            "factory": factory_result,
+            "belts": belts_result
+        }
+        if error is not None:
+            out["error"] = error
+        return out
+
+    if max_rounds < 1:
+        return result("invalid_input", "max_rounds must be at least 1")
+
+    non_raw = sorted({
+        value for value in template.get("sources", {}).values()
+        if isinstance(value, str) and value not in raw_supply_caps
+    })
+    if non_raw:
+        return result(
+            "invalid_input",
+            f"belts sources name items that are not in limits.raw_supply_per_min: {', '.join(non_raw)}"
+        )
+
+    for round_num in range(1, max_rounds + 1):
+        factory_result = solve_factory(factory_data, factory_backend)
+
+        if factory_result["status"] != "ok":
+            # Before any belt cap is applied this is the factory's own limit,
+            # which is reported as-is rather than planned around.
+            if round_num == 1:
+                return result("infeasible")
+            # Later rounds only fail because of belt caps. The max rate is backed
+            # off slightly, since LP backends round it and re-solving exactly at
+            # it can overshoot a cap.
+            max_rate = factory_result["max_feasible_target_per_min"] * (1.0 - RATE_BACKOFF)
+            if max_rate < TOLERANCE:
+                return result("belts_infeasible")
+            factory_data["target"]["rate_per_min"] = max_rate
+            factory_result = solve_factory(factory_data, factory_backend)
+            if factory_result["status"] != "ok":
+                return result("belts_infeasible")
+
+        raw_consumption = factory_result["raw_consumption_per_min"]
+        belts_data, item_nodes = build_belts_input(template, raw_consumption)
+        belts_result = solve_belts(belts_data, belts_backend)
+
+        if belts_result["status"] == "ok":
+            if factory_data["target"]["rate_per_min"] < requested_target_rate:
+                return result("target_reduced")
+            return result("ok")
+
+        caps = belt_caps(belts_data, item_nodes, belts_backend)
+        if not caps:
+            return result("belts_infeasible")
+
+        for item, cap in caps.items():
+            raw_supply_caps[item] = min(raw_supply_caps[item], cap)
+
+    return result("belts_infeasible")
+
+def main():
+    parser = argparse.ArgumentParser(description="Factory-to-belts planning pipeline (JSON on stdin/stdout).")
+    parser.add_argument("--factory-backend", choices=("auto",) + BACKENDS, default=None,
+                        help="factory solver backend; defaults to $FACTORY_BACKEND or auto")
+    parser.add_argument("--belts-backend", choices=("auto",) + tuple(FLOW_BACKENDS), default=None,
+                        help="belts max-flow algorithm; defaults to $BELTS_BACKEND or auto")
+    args = parser.parse_args()
+
+    try:
+        try:
+            indata = json.load(sys.stdin)
+        except json.JSONDecodeError as e:
+            sys.stderr.write(f"Error: Invalid JSON input. {e}\n")
+            return
+
+        result = solve_pipeline(indata, args.factory_backend, args.belts_backend)
+
+        try:
+            json.dump(result, sys.stdout, indent=None)
+        except (IOError, TypeError) as e:
+            sys.stderr.write(f"Error: Could not write JSON output. {e}\n")
+
+    except Exception as e:
+        sys.stderr.write(f"An unexpected error occurred: {e}\n")
+        json.dump({
+            "status": "infeasible",
+            "rounds": 0,
+            "factory": None,
+            "belts": None,
+            "error": str(e)
+        }, sys.stdout)
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,9 @@ import subprocess
 import pytest
 
 # Helper function to run the main script
-def run_belts(input_data):
+def run_belts(input_data, args=()):
     process = subprocess.Popen(
-        ["python3", "belts/main.py"],
+        ["python3", "belts/main.py", *args],
         stdin=subprocess.PIPE,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
@@ -81,4 +81,110 @@ def test_node_capacity():
     # The cut should identify that the node 'a' is the problem.
     # The split node a_IN -> a_OUT is the tight edge.
     assert set(output["cut_reachable"]) == {"s1", "s2", "a"}
-    assert abs(output["deficit"]["demand_balance"] - 20) < 1e-6
\ No newline at end of file
+    assert abs(output["deficit"]["demand_balance"] - 20) < 1e-6
+
+def test_max_throughput_node_cap():
+    """Max-throughput mode reports the 80 that fits through node 'a' and the gain of raising its cap."""
+    input_data = {
+        "sources": {"s1": 50, "s2": 50},
+        "sink": "t1",
+        "node_caps": {"a": 80},
+        "edges": [
+            {"from": "s1", "to": "a", "upper_bound": 50},
+            {"from": "s2", "to": "a", "upper_bound": 50},
+            {"from": "a", "to": "t1", "upper_bound": 100}
+        ]
+    }
+    output = run_belts(input_data, ["--max-throughput"])
+    assert output["status"] == "ok"
+    assert abs(output["max_flow_per_min"] - 80) < 1e-6
+    assert abs(output["unrouted_per_min"] - 20) < 1e-6
+    # Either source alone can still push its full supply through 'a'.
+    assert abs(output["per_source_max_per_min"]["s1"] - 50) < 1e-6
+    assert abs(output["per_source_max_per_min"]["s2"] - 50) < 1e-6
+    assert output["tight_nodes"] == [{"node": "a", "flow": 80.0, "marginal_gain": 1.0}]
+
+def test_max_throughput_with_lower_bound():
+    """The lower bound on s2 -> x is kept while the remaining capacity is filled."""
+    input_data = {
+        "sources": {"s1": 60, "s2": 60},
+        "sink": "t1",
+        "edges": [
+            {"from": "s1", "to": "a", "upper_bound": 60},
+            {"from": "s2", "to": "a", "upper_bound": 30},
+            {"from": "a", "to": "t1", "upper_bound": 70},
+            {"from": "s2", "to": "x", "lower_bound": 10, "upper_bound": 15},
+            {"from": "x", "to": "t1"}
+        ]
+    }
+    output = run_belts(input_data, ["--max-throughput"])
+    assert output["status"] == "ok"
+    assert abs(output["max_flow_per_min"] - 85) < 1e-6
+    assert abs(output["per_source_max_per_min"]["s1"] - 60) < 1e-6
+    assert abs(output["per_source_max_per_min"]["s2"] - 45) < 1e-6
+    gains = {(e["from"], e["to"]): e["marginal_gain"] for e in output["tight_edges"]}
+    assert gains[("a", "t1")] == 1.0
+    assert gains[("s2", "a")] == 0.0
+
+@pytest.mark.parametrize("backend", ["preflow_push", "edmonds_karp", "dinitz"])
+def test_backends_agree_on_cut(backend):
+    """Every max-flow backend reports the same deficit and min cut."""
+    input_data = {
+        "sources": {"s1": 100},
+        "sink": "t1",
+        "edges": [
+            {"from": "s1", "to": "a", "upper_bound": 100},
+            {"from": "a", "to": "t1", "upper_bound": 50}
+        ]
+    }
+    output = run_belts(input_data, ["--backend", backend])
+    assert output["status"] == "infeasible"
+    assert set(output["cut_reachable"]) == {"s1", "a"}
+    assert abs(output["deficit"]["demand_balance"] - 50) < 1e-6
+
+def test_mode_key_in_input_is_ignored():
+    """Only the CLI flag selects max-throughput mode; a "mode" key in the data does not."""
+    input_data = {
+        "mode": "max_throughput",
+        "sources": {"s1": 100},
+        "sink": "t1",
+        "edges": [{"from": "s1", "to": "t1", "upper_bound": 50}]
+    }
+    output = run_belts(input_data)
+    assert output["status"] == "infeasible"
+    assert abs(output["deficit"]["demand_balance"] - 50) < 1e-6
+
+def test_max_throughput_lower_bound_respects_node_cap():
+    """Lower-bound flow into a capped node must still fit through the node cap."""
+    input_data = {
+        "sources": {"n2": 8},
+        "sink": "t1",
+        "node_caps": {"n5": 7},
+        "edges": [
+            {"from": "n2", "to": "n5", "lower_bound": 8, "upper_bound": 8},
+            {"from": "n5", "to": "t1", "lower_bound": 8}
+        ]
+    }
+    output = run_belts(input_data, ["--max-throughput"])
+    assert output["status"] == "infeasible"
+    assert abs(output["deficit"]["demand_balance"] - 1) < 1e-6
+
+    output = run_belts(input_data)
+    assert output["status"] == "infeasible"
+
+def test_max_throughput_tight_node_reports_full_flow():
+    """A node fed by a lower-bounded edge reports its full flow, lower bound included."""
+    input_data = {
+        "sources": {"s": 12},
+        "sink": "t1",
+        "node_caps": {"n5": 10},
+        "edges": [
+            {"from": "s", "to": "n5", "lower_bound": 8, "upper_bound": 12},
+            {"from": "n5", "to": "t1", "lower_bound": 8},
+            {"from": "s", "to": "t1", "upper_bound": 1}
+        ]
+    }
+    output = run_belts(input_data, ["--max-throughput"])
+    assert output["status"] == "ok"
+    assert abs(output["max_flow_per_min"] - 11) < 1e-6
+    assert output["tight_nodes"] == [{"node": "n5", "flow": 10.0, "marginal_gain": 1.0}]
@@ -5,9 +5,9 @@ import subprocess
 import pytest
 
 # Helper function to run the main script
-def run_factory(input_data):
+def run_factory(input_data, args=()):
     process = subprocess.Popen(
-        ["python3", "factory/main.py"],
+        ["python3", "factory/main.py", *args],
         stdin=subprocess.PIPE,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
@@ -84,4 +84,83 @@ def test_lexicographical_tie_break():
     output = run_factory(input_data)
     assert output["status"] == "ok"
     assert abs(output["per_recipe_crafts_per_min"]["alpha_rod"]) < 1e-6
-    assert abs(output["per_recipe_crafts_per_min"]["beta_rod"] - 100) < 1e-6
\ No newline at end of file
+    assert abs(output["per_recipe_crafts_per_min"]["beta_rod"] - 100) < 1e-6
+
+def test_tree_backend_matches_lp():
+    """The closed-form tree backend agrees with the CBC LP on a chain of recipes."""
+    input_data = {
+        "machines": {"assembler_1": {"crafts_per_min": 30}, "chemical": {"crafts_per_min": 60}},
+        "recipes": {
+            "iron_plate": {"machine": "chemical", "time_s": 3.2, "in": {"iron_ore": 1}, "out": {"iron_plate": 1}},
+            "copper_plate": {"machine": "chemical", "time_s": 3.2, "in": {"copper_ore": 1}, "out": {"copper_plate": 1}},
+            "green_circuit": {"machine": "assembler_1", "time_s": 0.5, "in": {"iron_plate": 1, "copper_plate": 3}, "out": {"green_circuit": 1}}
+        },
+        "modules": {"assembler_1": {"prod": 0.1, "speed": 0.15}, "chemical": {"prod": 0.2, "speed": 0.1}},
+        "limits": {"raw_supply_per_min": {"iron_ore": 5000, "copper_ore": 3000}, "max_machines": {"assembler_1": 300, "chemical": 300}},
+        "target": {"item": "green_circuit", "rate_per_min": 1800}
+    }
+    # copper_ore caps the target, so both backends take the max-rate path.
+    tree = run_factory(input_data, ["--backend", "tree"])
+    lp = run_factory(input_data, ["--backend", "cbc"])
+    assert tree["status"] == lp["status"] == "infeasible"
+    assert tree["bottleneck_hint"] == lp["bottleneck_hint"] == ["copper_ore supply"]
+    assert abs(tree["max_feasible_target_per_min"] - lp["max_feasible_target_per_min"]) < 1e-3
+
+    input_data["limits"]["raw_supply_per_min"]["copper_ore"] = 5000
+    tree = run_factory(input_data, ["--backend", "tree"])
+    lp = run_factory(input_data, ["--backend", "cbc"])
+    assert tree["status"] == lp["status"] == "ok"
+    for r_name, crafts in lp["per_recipe_crafts_per_min"].items():
+        assert abs(tree["per_recipe_crafts_per_min"][r_name] - crafts) < 1e-3
+
+def test_tree_backend_rejects_cycles():
+    """A cyclic recipe graph cannot be forced onto the tree backend."""
+    input_data = {
+        "machines": {"assembler": {"crafts_per_min": 60}},
+        "recipes": {
+            "a_from_b": {"machine": "assembler", "time_s": 1, "in": {"b": 1, "ore": 1}, "out": {"a": 2}},
+            "b_from_a": {"machine": "assembler", "time_s": 1, "in": {"a": 1}, "out": {"b": 1}}
+        },
+        "limits": {"raw_supply_per_min": {"ore": 1000}, "max_machines": {"assembler": 10}},
+        "target": {"item": "a", "rate_per_min": 10}
+    }
+    output = run_factory(input_data, ["--backend", "tree"])
+    assert output["status"] == "infeasible"
+    assert "tree-shaped" in output["bottleneck_hint"][0]
+
+    output = run_factory(input_data)
+    assert output["status"] == "ok"
+
+def test_tree_backend_long_chain():
+    """A 1200-recipe chain is solved by the tree backend without hitting the recursion limit."""
+    n = 1200
+    recipes = {
+        f"r{i}": {
+            "machine": "assembler",
+            "time_s": 1,
+            "in": {f"i{i + 1}": 1} if i < n - 1 else {"ore": 1},
+            "out": {f"i{i}": 1}
+        }
+        for i in range(n)
+    }
+    input_data = {
+        "machines": {"assembler": {"crafts_per_min": 60}},
+        "recipes": recipes,
+        "limits": {"raw_supply_per_min": {"ore": 1000}},
+        "target": {"item": "i0", "rate_per_min": 10}
+    }
+    output = run_factory(input_data, ["--backend", "tree"])
+    assert output["status"] == "ok"
+    assert abs(output["raw_consumption_per_min"]["ore"] - 10) < 1e-6
+
+def test_tree_backend_negligible_usage():
+    """A raw draw of 1e-14 per craft is round-off; the tree backend agrees with the LP instead of raising."""
+    input_data = {
+        "machines": {"assembler": {"crafts_per_min": 60}},
+        "recipes": {"widget": {"machine": "assembler", "time_s": 1, "in": {"ore": 1e-14}, "out": {"widget": 1}}},
+        "limits": {"raw_supply_per_min": {"ore": 0}},
+        "target": {"item": "widget", "rate_per_min": 1e6}
+    }
+    tree = run_factory(input_data, ["--backend", "tree"])
+    lp = run_factory(input_data, ["--backend", "cbc"])
+    assert tree["status"] == lp["status"] == "ok"
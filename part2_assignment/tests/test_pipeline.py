@@ -0,0 +1,198 @@
+# part2_assignment/tests/test_pipeline.py
+
+import json
+import subprocess
+import pytest
+
+# Helper function to run the main script
+def run_pipeline(input_data, args=()):
+    process = subprocess.Popen(
+        ["python3", "pipeline/main.py", *args],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    stdout, stderr = process.communicate(json.dumps(input_data))
+    assert process.returncode == 0, f"Process failed with stderr: {stderr}"
+    return json.loads(stdout)
+
+def widget_factory(rate):
+    return {
+        "machines": {"assembler": {"crafts_per_min": 60}},
+        "recipes": {"widget": {"machine": "assembler", "time_s": 1, "in": {"ore": 1}, "out": {"widget": 1}}},
+        "limits": {"raw_supply_per_min": {"ore": 10000}, "max_machines": {"assembler": 10}},
+        "target": {"item": "widget", "rate_per_min": rate}
+    }
+
+def test_belts_carry_factory_demand():
+    """The belts can carry everything the factory consumes, so one round is enough."""
+    input_data = {
+        "factory": widget_factory(600),
+        "belts": {
+            "sources": {"mine": "ore"},
+            "sink": "factory",
+            "edges": [{"from": "mine", "to": "factory", "upper_bound": 1000}]
+        }
+    }
+    output = run_pipeline(input_data)
+    assert output["status"] == "ok"
+    assert output["rounds"] == 1
+    assert abs(output["belts"]["max_flow_per_min"] - 600) < 1e-6
+    assert abs(output["factory"]["per_recipe_crafts_per_min"]["widget"] - 600) < 1e-6
+
+def test_belt_cut_caps_raw_supply():
+    """Two mines share a belt that only carries 400 ore, so the factory is re-solved at 400."""
+    input_data = {
+        "factory": widget_factory(600),
+        "belts": {
+            "sources": {"mine_a": "ore", "mine_b": "ore"},
+            "sink": "factory",
+            "edges": [
+                {"from": "mine_a", "to": "bus", "upper_bound": 1000},
+                {"from": "mine_b", "to": "bus", "upper_bound": 1000},
+                {"from": "bus", "to": "factory", "upper_bound": 400}
+            ]
+        }
+    }
+    output = run_pipeline(input_data)
+    assert output["status"] == "target_reduced"
+    assert output["rounds"] == 2
+    assert output["requested_target_per_min"] == 600
+    assert abs(output["raw_supply_caps"]["ore"] - 400) < 1e-6
+    # The reduced target is backed off by a relative 1e-6 to absorb LP round-off.
+    assert 400 * (1 - 1e-5) < output["target_per_min"] <= 400
+    assert output["belts"]["max_flow_per_min"] <= 400
+
+def test_numeric_source_bottleneck_keeps_raw_caps():
+    """Only a numeric source is short of belt capacity, so the ore cap is left alone."""
+    input_data = {
+        "factory": widget_factory(600),
+        "belts": {
+            "sources": {"mine": "ore", "other": 500},
+            "sink": "f",
+            "edges": [
+                {"from": "mine", "to": "f", "upper_bound": 1000},
+                {"from": "other", "to": "f", "upper_bound": 100}
+            ]
+        }
+    }
+    output = run_pipeline(input_data)
+    assert output["status"] == "belts_infeasible"
+    assert output["rounds"] == 1
+    assert output["raw_supply_caps"]["ore"] == 10000
+    assert output["target_per_min"] == 600
+    assert set(output["belts"]["cut_reachable"]) == {"other"}
+
+def test_factory_limit_is_not_planned_around():
+    """A target the factory alone cannot reach is reported, not silently lowered."""
+    input_data = {
+        "factory": widget_factory(60000),
+        "belts": {
+            "sources": {"mine": "ore"},
+            "sink": "factory",
+            "edges": [{"from": "mine", "to": "factory", "upper_bound": 10000}]
+        }
+    }
+    output = run_pipeline(input_data)
+    assert output["status"] == "infeasible"
+    assert output["target_per_min"] == 60000
+    assert abs(output["factory"]["max_feasible_target_per_min"] - 10000) < 1e-6
+    assert output["belts"] is None
+
+def test_template_mode_does_not_leak_into_belts():
+    """A "mode" key in the belts template does not turn the feasibility check off."""
+    input_data = {
+        "factory": widget_factory(600),
+        "belts": {
+            "mode": "max_throughput",
+            "sources": {"mine": "ore"},
+            "sink": "factory",
+            "edges": [{"from": "mine", "to": "factory", "upper_bound": 100}]
+        }
+    }
+    output = run_pipeline(input_data)
+    assert output["status"] == "target_reduced"
+    assert abs(output["target_per_min"] - 100) < 1e-3
+
+def test_max_rounds_must_be_positive():
+    input_data = {
+        "factory": widget_factory(600),
+        "belts": {"sources": {"mine": "ore"}, "sink": "factory", "edges": []},
+        "max_rounds": 0
+    }
+    output = run_pipeline(input_data)
+    assert output["status"] == "invalid_input"
+    assert output["error"] == "max_rounds must be at least 1"
+    assert output["rounds"] == 0
+    assert output["requested_target_per_min"] == 600
+    assert output["target_per_min"] == 600
+
+def test_uneven_belts_share_one_item():
+    """The max-flow splits ore 100/500 across uneven belts, so the full 600 fits in one round."""
+    input_data = {
+        "factory": widget_factory(600),
+        "belts": {
+            "sources": {"mine_a": "ore", "mine_b": "ore"},
+            "sink": "factory",
+            "edges": [
+                {"from": "mine_a", "to": "factory", "upper_bound": 100},
+                {"from": "mine_b", "to": "factory", "upper_bound": 1000}
+            ]
+        }
+    }
+    output = run_pipeline(input_data)
+    assert output["status"] == "ok"
+    assert output["rounds"] == 1
+    assert abs(output["belts"]["max_flow_per_min"] - 600) < 1e-6
+
+def test_uneven_belts_cap_in_one_step():
+    """When the belts carry only 350 of 600 ore, the cap is taken from the routed flow in one step."""
+    input_data = {
+        "factory": widget_factory(600),
+        "belts": {
+            "sources": {"mine_a": "ore", "mine_b": "ore"},
+            "sink": "factory",
+            "edges": [
+                {"from": "mine_a", "to": "factory", "upper_bound": 100},
+                {"from": "mine_b", "to": "factory", "upper_bound": 250}
+            ]
+        }
+    }
+    output = run_pipeline(input_data)
+    assert output["status"] == "target_reduced"
+    assert output["rounds"] == 2
+    assert abs(output["raw_supply_caps"]["ore"] - 350) < 1e-6
+
+def test_lp_round_off_is_not_reported_as_factory_limit():
+    """CBC rounds the capped max rate; the pipeline still finds a plan instead of reporting infeasible."""
+    factory = widget_factory(600)
+    factory["modules"] = {"assembler": {"prod": 0.1}}
+    input_data = {
+        "factory": factory,
+        "belts": {
+            "sources": {"mine": "ore"},
+            "sink": "factory",
+            "edges": [{"from": "mine", "to": "factory", "upper_bound": 333.3333333}]
+        }
+    }
+    for backend in ("cbc", "tree"):
+        output = run_pipeline(input_data, ["--factory-backend", backend])
+        assert output["status"] == "target_reduced"
+        assert output["belts"]["max_flow_per_min"] <= 333.3333333
+
+def test_non_raw_item_source_is_rejected():
+    """A template source naming an intermediate item is rejected before the first round."""
+    input_data = {
+        "factory": widget_factory(600),
+        "belts": {
+            "sources": {"mine": "ore", "plates": "plate"},
+            "sink": "factory",
+            "edges": [{"from": "mine", "to": "factory"}, {"from": "plates", "to": "factory"}]
+        }
+    }
+    output = run_pipeline(input_data)
+    assert output["status"] == "invalid_input"
+    assert "plate" in output["error"]
+    assert output["rounds"] == 0
+    assert "plate" not in output["raw_supply_caps"]